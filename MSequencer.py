@@ -2,11 +2,13 @@
 """
 Music Sequencer - Python GUI Version
 A melody sequencer with 8 notes × 16 steps, inspired by the web-based Tone.js sequencer.
-Features: Play/Stop, Save/Load patterns, 5 save slots, Export/Import JSON, Tempo control.
+Features: Play/Stop, Save/Load patterns, 5 save slots, Export/Import JSON, Tempo control,
+Playback timing telemetry (live jitter, CSV/JSON trace dump).
 """
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, font
+import csv
 import json
 import os
 import threading
@@ -67,6 +69,10 @@ class MusicSequencer:
         # Audio synthesis
         self.synth = SynthEngine()
         
+        # Playback timing telemetry
+        self.telemetry = PlaybackTelemetry()
+        self.telemetry_job = None
+        
         # Build UI
         self._build_ui()
         self._update_slot_display()
@@ -244,6 +250,19 @@ class MusicSequencer:
         )
         import_btn.pack(side=tk.LEFT, padx=5)
         
+        trace_btn = tk.Button(
+            import_export_row,
+            text="📊 Dump Trace",
+            bg="#64748b",
+            fg="white",
+            font=("Helvetica", 10, "bold"),
+            padx=15,
+            pady=8,
+            command=self._dump_trace,
+            cursor="hand2"
+        )
+        trace_btn.pack(side=tk.LEFT, padx=5)
+        
         # Tempo section
         tempo_frame = tk.LabelFrame(main_frame, text="Tempo Control", bg="white", font=("Helvetica", 10, "bold"))
         tempo_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -272,6 +291,10 @@ class MusicSequencer:
         # Status message
         self.status_label = tk.Label(main_frame, text="", bg="white", fg="#374151", font=("Helvetica", 9))
         self.status_label.pack(pady=10)
+        
+        # Live playback timing
+        self.timing_label = tk.Label(main_frame, text="", bg="white", fg="#6b7280", font=("Courier", 9))
+        self.timing_label.pack(pady=(0, 10))
     
     def _build_grid(self, parent):
         """Build the sequencer grid."""
@@ -352,21 +375,30 @@ class MusicSequencer:
         self.play_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
+        self.telemetry.reset()
         self.playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
         self.playback_thread.start()
+        self._update_timing_display()
     
     def _playback_loop(self):
         """Main playback loop."""
+        scheduled_time = time.perf_counter()
         while self.is_playing and not self.stop_playback_event.is_set():
+            actual_time = time.perf_counter()
             step = self.current_step % self.num_steps
             
             # Highlight current step
             self.root.after(0, lambda s=step: self._highlight_step(s))
+            ui_done = time.perf_counter()
             
             # Play notes for this step
             for note_idx, note in enumerate(self.notes):
                 if self.grid[note_idx][step]:
                     self.synth.play_note(note, duration=0.2)
+            synth_done = time.perf_counter()
+            
+            self.telemetry.record(step, scheduled_time, actual_time,
+                                  synth_done - ui_done, ui_done - actual_time)
             
             self.current_step += 1
             
@@ -374,6 +406,7 @@ class MusicSequencer:
             # At 120 BPM, 16 steps = 2 beats, so each step = 0.25 beats
             beat_duration = 60 / self.tempo
             step_duration = beat_duration * 0.5  # 8th note
+            scheduled_time += step_duration
             
             time.sleep(step_duration)
     
@@ -384,9 +417,46 @@ class MusicSequencer:
         
         self.root.after(0, self._clear_highlight)
         
+        if self.telemetry_job is not None:
+            self.root.after_cancel(self.telemetry_job)
+            self.telemetry_job = None
+        
         self.play_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
     
+    def _update_timing_display(self):
+        """Refresh the live jitter readout while playing."""
+        summary = self.telemetry.summary(window=PlaybackTelemetry.LIVE_WINDOW)
+        if summary:
+            self.timing_label.config(text=(
+                f"Jitter p50 {summary['jitter_p50_ms']:.1f} ms · p99 {summary['jitter_p99_ms']:.1f} ms · "
+                f"drift {summary['drift_ms']:+.1f} ms · synth {summary['synth_p50_ms']:.2f} ms · "
+                f"UI {summary['ui_p50_ms']:.2f} ms"
+            ))
+        self.telemetry_job = self.root.after(500, self._update_timing_display)
+    
+    def _dump_trace(self):
+        """Write the recorded playback timing trace to a CSV or JSON file."""
+        try:
+            if not len(self.telemetry):
+                self._show_message("No playback timing recorded yet", error=True)
+                return
+            
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")],
+                initialfile="playback_trace.csv"
+            )
+            
+            if file_path:
+                if file_path.lower().endswith(".json"):
+                    self.telemetry.dump_json(file_path)
+                else:
+                    self.telemetry.dump_csv(file_path)
+                self._show_message("Timing trace saved!")
+        except Exception as e:
+            messagebox.showerror("Trace Error", f"Failed to save trace: {e}")
+    
     def _clear_grid(self):
         """Clear the entire grid."""
         self._stop_playback()
@@ -580,6 +650,93 @@ class MusicSequencer:
         self.root.destroy()
 
 
+class PlaybackTelemetry:
+    """Fixed-size ring buffer of per-step playback timings.
+    
+    Times come from time.perf_counter(); costs are in seconds. Only the most recent
+    `capacity` steps are kept so recording stays cheap during long sessions. A lock
+    keeps readers from seeing a row half-written by the playback thread.
+    """
+    
+    FIELDS = ("step", "scheduled", "actual", "synth_cost", "ui_cost")
+    LIVE_WINDOW = 128  # Steps behind the live readout (~32 s at 120 BPM)
+    
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(self.FIELDS)))
+        self._count = 0
+        self._start = 0.0
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return min(self._count, self.capacity)
+    
+    def reset(self):
+        """Clear recorded steps (called when playback starts)."""
+        with self._lock:
+            self._count = 0
+            self._start = time.perf_counter()
+    
+    def record(self, step, scheduled, actual, synth_cost, ui_cost):
+        """Record one step; called from the playback thread."""
+        with self._lock:
+            self._data[self._count % self.capacity] = (step, scheduled, actual, synth_cost, ui_cost)
+            self._count += 1
+    
+    def snapshot(self, last=None):
+        """Recorded rows in chronological order; only the newest `last` rows if given."""
+        with self._lock:
+            count = self._count
+            data = self._data.copy()
+        rows = data[:count] if count <= self.capacity else np.roll(data, -(count % self.capacity), axis=0)
+        return rows[-last:] if last else rows
+    
+    def summary(self, window=None):
+        """Jitter/drift/cost percentiles in milliseconds over the newest `window` steps
+        (all recorded steps if None), or None if too few steps."""
+        rows = self.snapshot(window)
+        if len(rows) < 2:
+            return None
+        
+        # Jitter: how far each step interval strays from its scheduled interval
+        jitter = np.abs(np.diff(rows[:, 2]) - np.diff(rows[:, 1])) * 1000
+        return {
+            "steps": len(rows),
+            "jitter_p50_ms": float(np.percentile(jitter, 50)),
+            "jitter_p99_ms": float(np.percentile(jitter, 99)),
+            "drift_ms": float((rows[-1, 2] - rows[-1, 1]) * 1000),
+            "synth_p50_ms": float(np.percentile(rows[:, 3], 50) * 1000),
+            "synth_p99_ms": float(np.percentile(rows[:, 3], 99) * 1000),
+            "ui_p50_ms": float(np.percentile(rows[:, 4], 50) * 1000),
+            "ui_p99_ms": float(np.percentile(rows[:, 4], 99) * 1000),
+        }
+    
+    def _trace_rows(self):
+        """Rows as dicts with times relative to playback start."""
+        return [
+            {
+                "step": int(step),
+                "scheduled": scheduled - self._start,
+                "actual": actual - self._start,
+                "synth_cost": synth_cost,
+                "ui_cost": ui_cost,
+            }
+            for step, scheduled, actual, synth_cost, ui_cost in self.snapshot().tolist()
+        ]
+    
+    def dump_csv(self, path):
+        """Write the trace as CSV (times in seconds)."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(self._trace_rows())
+    
+    def dump_json(self, path):
+        """Write the trace and its summary as JSON (times in seconds)."""
+        with open(path, 'w') as f:
+            json.dump({"summary": self.summary(), "steps": self._trace_rows()}, f, indent=2)
+
+
 class SynthEngine:
     """Simple synthesizer using pygame."""
     
@@ -590,11 +747,8 @@ class SynthEngine:
             "G4": 392.00, "A4": 440.00, "B4": 493.88, "C5": 523.25
         }
     
-    def play_note(self, note, duration=0.2, volume=0.3):
-        """Play a single note."""
-        if not PYGAME_AVAILABLE:
-            return
-        
+    def render_note(self, note, duration=0.2, volume=0.3):
+        """Synthesize a note as a 16-bit stereo sample array."""
         freq = self.note_freqs.get(note, 440)
         
         # Generate simple sine wave
@@ -612,6 +766,14 @@ class SynthEngine:
         stereo_wave = np.zeros((len(wave), 2), dtype=np.int16)
         stereo_wave[:, 0] = wave
         stereo_wave[:, 1] = wave
+        return stereo_wave
+    
+    def play_note(self, note, duration=0.2, volume=0.3):
+        """Play a single note."""
+        if not PYGAME_AVAILABLE:
+            return
+        
+        stereo_wave = self.render_note(note, duration, volume)
         
         try:
             sound = pygame.sndarray.make_sound(stereo_wave)
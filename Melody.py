@@ -1,34 +1,49 @@
-import librosa
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
+from melody_extraction import extract_melody
+from melody_profiling import StageProfiler
+
+parser = argparse.ArgumentParser(description="Extract the melody from an audio file")
+parser.add_argument("audio_path", nargs="?", default='path_to_your_audio_file.wav')
+parser.add_argument("--report", action="store_true", help="Print a per-stage timing report")
+parser.add_argument("--memory", action="store_true",
+                    help="Record peak memory per stage (tracemalloc; slows the timings)")
+parser.add_argument("--cprofile", metavar="PATH", help="Save a cProfile capture to PATH (no memory tracking)")
+args = parser.parse_args()
+
+profiler = StageProfiler(
+    enabled=args.report or args.memory or bool(args.cprofile),
+    track_memory=args.memory,
+    cprofile=bool(args.cprofile),
+)
+
+with profiler:
+    # Load the audio file and extract pitches using librosa's piptrack method
+    audio_path = args.audio_path
+    pitch_values, midi_notes = extract_melody(audio_path, profiler)
+
+    # Plot the pitch over time
+    with profiler.stage("plot"):
+        plt.figure(figsize=(14, 5))
+        plt.plot(pitch_values)
+        plt.title('Pitch over Time')
+        plt.xlabel('Time')
+        plt.ylabel('Pitch (Hz)')
+        # Render now so drawing is timed here rather than inside plt.show()
+        plt.gcf().canvas.draw()
+
+if args.report or args.memory:
+    print(profiler.report())
+if args.cprofile:
+    profiler.dump_cprofile(args.cprofile)
+    print(f"cProfile capture saved to {args.cprofile}")
 
-# Load the audio file
-audio_path = 'path_to_your_audio_file.wav'
-y, sr = librosa.load(audio_path)
-
-# Extract pitches using librosa's piptrack method
-pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
-
-# Get the pitches
-pitch_values = []
-for t in range(pitches.shape[1]):
-    index = magnitudes[:, t].argmax()
-    pitch = pitches[index, t]
-    if pitch > 0:  # filter out non-zero pitches
-        pitch_values.append(pitch)
-
-# Convert pitch values to MIDI notes
-midi_notes = librosa.hz_to_midi(pitch_values)
-
-# Plot the pitch over time
-plt.figure(figsize=(14, 5))
-plt.plot(pitch_values)
-plt.title('Pitch over Time')
-plt.xlabel('Time')
-plt.ylabel('Pitch (Hz)')
 plt.show()
 
 # Optionally, print out the MIDI notes
 print(midi_notes)
 
 # Add a GUI for this code
+quantized_notes = np.round(midi_notes)
+print(quantized_notes)
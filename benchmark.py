@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Headless performance checks for Project-M
+Runs on synthetic inputs: SynthEngine synthesis, playback scheduling accuracy,
+slot save/load/export/import round-trips and the shared extract_melody pipeline on
+generated tones (10 s to 1 h). Results are written as JSON and compared against
+a stored baseline using per-metric tolerances; suspected regressions are re-run
+before they are reported, or marked inconclusive when the machine is busier
+than it was for the baseline.
+
+    python3 benchmark.py --quick                       # Short run
+    python3 benchmark.py --save-baseline               # Record this machine's baseline
+    python3 benchmark.py --baseline benchmark_baseline.json   # Exit 1 on confirmed regressions, 3 if inconclusive
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+import wave
+from pathlib import Path
+import numpy as np
+from melody_profiling import StageProfiler
+
+try:
+    import MSequencer
+    SEQUENCER_AVAILABLE = True
+except ImportError as e:
+    SEQUENCER_AVAILABLE = False
+    print(f"Warning: MSequencer unavailable ({e}). Synthesis, sequencing and I/O benchmarks skipped.")
+
+try:
+    import librosa
+    from melody_extraction import extract_melody
+    LIBROSA_AVAILABLE = True
+except ImportError:
+    LIBROSA_AVAILABLE = False
+    print("Warning: librosa not available. Extraction benchmarks skipped. Install with: pip install librosa")
+
+
+SEED = 1234
+TONE_LENGTHS = [10, 60, 600, 3600]  # Seconds
+QUICK_TONE_LENGTHS = [10, 60]
+
+# Playback runs far above the UI's 240 BPM limit so the jitter percentiles get
+# hundreds of steps in a few seconds; the loop's scheduling code is the same
+SEQUENCING_TEMPO = 960
+SEQUENCING_STEPS = 1024
+QUICK_SEQUENCING_STEPS = 256
+
+# Regression tolerances, first match wins: (metric pattern, allowed relative slowdown,
+# absolute change always treated as noise). Both sides are medians (batched samples
+# within a run, then across runs). CPU-bound timings are judged relative to the
+# reference workload; sequencing jitter is sleep-driven, so it stays absolute and
+# its p99 tail gets the widest margin.
+TOLERANCES = [
+    ("sequencing.jitter_p99_ms", 0.5, 1.0),
+    ("sequencing.*", 0.3, 0.05),
+    ("synth.*", 0.2, 0.0),
+    ("io.*", 0.3, 0.0),
+    ("extract.*.peak_mb", 0.1, 5.0),
+    ("extract.*", 0.3, 0.01),
+]
+
+# Wall-clock metrics that can't be normalized: playback scheduling and file I/O slow
+# down under host contention in ways CPU work doesn't. Each is paired with a machine.*
+# metric measured in the same benchmark (a bare sleep loop's jitter, the reference
+# workload's speed): (metric pattern, machine metric, ratio and absolute increase over
+# the baseline that both mean "busier"). Regressions on a busier machine are reported
+# as inconclusive instead of failing the run; machine.* metrics never regress.
+CONTENTION_SENSITIVE = [
+    ("sequencing.*", "machine.timer_p99_ms", 2.0, 1.0),
+    ("io.*", "machine.reference_ms", 1.5, 0.0),
+]
+
+# Short tones are analyzed this many times (median per stage); long ones once
+EXTRACTION_REPEAT = 3
+EXTRACTION_REPEAT_MAX_LENGTH = 60
+
+# Metric name prefix -> benchmark group, for re-running suspected regressions
+METRIC_GROUPS = {"synth": "synthesis", "sequencing": "sequencing", "io": "io", "extract": "extraction"}
+
+
+def _reference_work():
+    """Fixed CPU workload timed alongside each benchmark to cancel out machine speed changes.
+
+    Covers both cache-resident and larger-than-cache arrays (0.2 s and 1 s of audio)
+    plus some interpreter work, so it slows down the same way the benchmarks do.
+    """
+    for num_samples in (4410, 22050):
+        x = np.linspace(0, 100, num_samples)
+        np.sin(x) * np.hanning(num_samples)
+    sum(i * i for i in range(200))
+
+
+def _batch_size(func, sample_seconds):
+    """Number of calls to func that take about `sample_seconds`."""
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= sample_seconds / 2:
+            return max(1, int(batch * sample_seconds / elapsed))
+        batch *= 2
+
+
+def _batch_time(func, batch):
+    # Like timeit, keep garbage collection out of the timing: its cost depends on
+    # how many objects earlier benchmarks left alive, not on the code being timed
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(batch):
+            func()
+        return (time.perf_counter() - start) / batch
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _reference_time(sample_seconds=0.02):
+    """Per-call time of the reference workload right now."""
+    return _batch_time(_reference_work, _batch_size(_reference_work, sample_seconds))
+
+
+def _time_per_call(func, samples, sample_seconds=0.01):
+    """Median per-call time of func, plus its median ratio to the reference workload.
+
+    Sub-millisecond calls are timed in batches. Each batch alternates with a batch
+    of _reference_work, and the ratio of the pair is kept: on shared VMs absolute
+    speed swings by more than 50% within seconds, but the paired ratio stays
+    within a few percent, so regressions are judged on the ratio.
+    """
+    batch = _batch_size(func, sample_seconds)
+    reference_batch = _batch_size(_reference_work, sample_seconds)
+    timings, ratios = [], []
+    for _ in range(samples):
+        reference = _batch_time(_reference_work, reference_batch)
+        timing = _batch_time(func, batch)
+        timings.append(timing)
+        ratios.append(timing / reference)
+    return {"value": statistics.median(timings), "unit": "s", "relative": statistics.median(ratios)}
+
+
+def _random_grid(rng, num_notes=8, num_steps=16, density=0.25):
+    return (rng.random((num_notes, num_steps)) < density).tolist()
+
+
+def _init_mixer():
+    """Initialize pygame's mixer if possible; True when notes really play."""
+    if not (SEQUENCER_AVAILABLE and MSequencer.PYGAME_AVAILABLE):
+        return False
+    if MSequencer.pygame.mixer.get_init():
+        return True
+    try:
+        MSequencer.pygame.mixer.init()
+    except Exception as e:
+        print(f"Warning: pygame mixer unavailable ({e}); play_note is a no-op")
+        return False
+    return True
+
+
+class _HeadlessRoot:
+    """Stands in for the Tk root: runs nothing scheduled via after(), so the
+    playback loop's UI cost is not measured here."""
+
+    def after(self, delay, callback=None):
+        return None
+
+
+class _HeadlessTempoScale:
+    def set(self, value):
+        pass
+
+
+class _HeadlessSequencer:
+    """MusicSequencer state without widgets, reusing its playback and slot methods."""
+
+    if SEQUENCER_AVAILABLE:
+        _playback_loop = MSequencer.MusicSequencer._playback_loop
+        _save_pattern = MSequencer.MusicSequencer._save_pattern
+        _load_pattern = MSequencer.MusicSequencer._load_pattern
+        _export_pattern = MSequencer.MusicSequencer._export_pattern
+        _import_pattern = MSequencer.MusicSequencer._import_pattern
+
+    def __init__(self, save_dir, grid, tempo=120):
+        self.root = _HeadlessRoot()
+        self.notes = ["C5", "B4", "A4", "G4", "F4", "E4", "D4", "C4"]
+        self.num_steps = 16
+        self.grid = grid
+        self.tempo = tempo
+        self.tempo_scale = _HeadlessTempoScale()
+        self.current_step = 0
+        self.current_slot = 0
+        self.is_playing = False
+        self.stop_playback_event = threading.Event()
+        self.save_dir = Path(save_dir)
+        self.synth = MSequencer.SynthEngine()
+        self.telemetry = MSequencer.PlaybackTelemetry()
+
+    def _update_slot_display(self):
+        pass
+
+    def _update_all_cells_visual(self):
+        pass
+
+    def _show_message(self, message, error=False):
+        if error:
+            raise RuntimeError(message)
+
+
+def bench_synthesis(repeat):
+    """SynthEngine.render_note (and play_note when pygame can open an audio device)."""
+    synth = MSequencer.SynthEngine()
+    results = {}
+    for duration in (0.2, 1.0):
+        results[f"synth.render_note.{duration}s"] = _time_per_call(
+            lambda: synth.render_note("A4", duration=duration), repeat * 8)
+
+    if _init_mixer():
+        results["synth.play_note.0.2s"] = _time_per_call(lambda: synth.play_note("A4", duration=0.2), repeat * 8)
+    return results
+
+
+def _timer_jitter_p99(num_steps, step_duration):
+    """Jitter p99 (ms) of a bare sleep loop: how noisy the OS timer is right now."""
+    telemetry = MSequencer.PlaybackTelemetry()
+    telemetry.reset()
+    scheduled_time = time.perf_counter()
+    for step in range(num_steps):
+        telemetry.record(step, scheduled_time, time.perf_counter(), 0.0, 0.0)
+        scheduled_time += step_duration
+        time.sleep(step_duration)
+    return telemetry.summary()["jitter_p99_ms"]
+
+
+def bench_sequencing(num_steps, tempo):
+    """Run the real playback loop on a busy pattern and report its step timing.
+
+    Note cost (synth_p99_ms) is only reported when the mixer plays real audio;
+    without it play_note returns at once and there is nothing to time. A bare
+    sleep loop at the same step length runs before and after, and its worse
+    jitter p99 is reported as machine.timer_p99_ms.
+    """
+    audio = _init_mixer()
+    step_duration = 60 / tempo * 0.5
+    probe_steps = max(num_steps // 4, 32)
+    timer_p99 = _timer_jitter_p99(probe_steps, step_duration)
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = _random_grid(np.random.default_rng(SEED), density=0.5)
+        sequencer = _HeadlessSequencer(tmp, grid, tempo=tempo)
+        sequencer.is_playing = True
+        sequencer.telemetry.reset()
+
+        thread = threading.Thread(target=sequencer._playback_loop, daemon=True)
+        thread.start()
+        while sequencer.current_step < num_steps and thread.is_alive():
+            time.sleep(0.01)
+        sequencer.is_playing = False
+        sequencer.stop_playback_event.set()
+        thread.join()
+    timer_p99 = max(timer_p99, _timer_jitter_p99(probe_steps, step_duration))
+
+    summary = sequencer.telemetry.summary() or {}
+    if "drift_ms" in summary:
+        # Drift accumulates with every step; per step it is comparable across run lengths
+        summary["drift_per_step_ms"] = summary["drift_ms"] / summary["steps"]
+    keys = ["jitter_p50_ms", "jitter_p99_ms", "drift_per_step_ms"] + (["synth_p99_ms"] if audio else [])
+    results = {f"sequencing.{key}": {"value": summary[key], "unit": "ms"} for key in keys if key in summary}
+    results["machine.timer_p99_ms"] = {"value": timer_p99, "unit": "ms"}
+    return results
+
+
+def bench_io(repeat):
+    """Slot save/load and export/import round-trips through the sequencer's own methods.
+
+    Also reports how fast the reference workload ran meanwhile (machine.reference_ms).
+    """
+    rng = np.random.default_rng(SEED)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sequencer = _HeadlessSequencer(tmp, _random_grid(rng))
+        export_path = str(Path(tmp) / "export.json")
+
+        def save_load():
+            sequencer._save_pattern()
+            sequencer._load_pattern()
+
+        def export_import():
+            sequencer._export_pattern()
+            sequencer._import_pattern()
+
+        results["io.save_load"] = _time_per_call(save_load, repeat * 8)
+
+        # Point the file dialogs at a fixed path for the duration of the run
+        real_filedialog = MSequencer.filedialog
+        MSequencer.filedialog = types.SimpleNamespace(
+            asksaveasfilename=lambda **kwargs: export_path,
+            askopenfilename=lambda **kwargs: export_path,
+        )
+        try:
+            results["io.export_import"] = _time_per_call(export_import, repeat * 8)
+        finally:
+            MSequencer.filedialog = real_filedialog
+
+    if sequencer.grid != _random_grid(np.random.default_rng(SEED)):
+        raise RuntimeError("Pattern changed during save/load round-trip")
+    # Reference workload speed while the I/O was timed
+    results["machine.reference_ms"] = {
+        "value": statistics.median(r["value"] / r["relative"] for r in results.values()) * 1000,
+        "unit": "ms",
+    }
+    return results
+
+
+def _write_tone(path, seconds, sr=22050):
+    """Write a 16-bit mono WAV of a stepped sine melody (one note per 250 ms)."""
+    rng = np.random.default_rng(SEED)
+    note_samples = sr // 4
+    num_notes = -(-int(seconds * sr) // note_samples)
+    freqs = 440.0 * 2 ** ((rng.integers(60, 73, num_notes) - 69) / 12)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        # Write in blocks of notes to bound memory on long tones
+        t = np.arange(note_samples) / sr
+        for block in np.array_split(freqs, max(1, num_notes // 1024)):
+            samples = 0.3 * np.sin(2 * np.pi * block[:, None] * t[None, :])
+            f.writeframes((samples.reshape(-1) * 32767).astype(np.int16).tobytes())
+
+
+def _warm_up_extraction():
+    """Run the pipeline once on a short tone before anything is timed.
+
+    librosa imports scipy, numba and friends lazily, and loading them changes how
+    fast plain numpy code runs afterwards (synthesis ratios move by ~30%). Doing it
+    up front puts every group, and every re-run, in the same process state; it
+    also keeps numba's JIT out of the first extraction timing.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "warmup.wav"
+        _write_tone(path, 1)
+        extract_melody(path)
+
+
+def bench_extraction(lengths, memory_lengths=()):
+    """melody_extraction.extract_melody on generated tones of several lengths.
+
+    Timings come from a pass without tracemalloc; peak memory for `memory_lengths`
+    comes from a separate pass so its overhead never reaches the timings.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in lengths:
+            path = Path(tmp) / f"tone_{seconds}s.wav"
+            _write_tone(path, seconds)
+
+            repeat = EXTRACTION_REPEAT if seconds <= EXTRACTION_REPEAT_MAX_LENGTH else 1
+            stage_times = {}
+            for _ in range(repeat):
+                # Reference timed either side of the run to normalize for machine speed
+                reference = _reference_time()
+                profiler = StageProfiler()
+                with profiler:
+                    extract_melody(path, profiler)
+                reference = (reference + _reference_time()) / 2
+                for record in profiler.stages:
+                    name = record["name"].replace(" ", "_")
+                    stage_times.setdefault(name, []).append((record["seconds"], reference))
+                stage_times.setdefault("total", []).append((profiler.total_seconds, reference))
+            for name, values in stage_times.items():
+                results[f"extract.{seconds}s.{name}"] = {
+                    "value": statistics.median(value for value, _ in values),
+                    "unit": "s",
+                    "relative": statistics.median(value / reference for value, reference in values),
+                }
+            print(f"Extraction of {seconds} s tone (last of {repeat}):\n{profiler.report()}")
+
+            if seconds in memory_lengths:
+                profiler = StageProfiler(track_memory=True)
+                with profiler:
+                    extract_melody(path, profiler)
+                for record in profiler.stages:
+                    key = f"extract.{seconds}s.{record['name'].replace(' ', '_')}.peak_mb"
+                    results[key] = {"value": record["peak_mb"], "unit": "MB"}
+            path.unlink()
+    return results
+
+
+def config_mismatch(config, baseline):
+    """Settings that differ between this run and the baseline's run."""
+    previous = baseline.get("meta", {}).get("config", {})
+    return [
+        f"{key}: baseline {previous.get(key)!r}, this run {value!r}"
+        for key, value in config.items()
+        if previous.get(key) != value
+    ]
+
+
+def tolerance(name, threshold=None):
+    """(relative, absolute) tolerance for a metric; `threshold` overrides the relative part."""
+    for pattern, relative, absolute in TOLERANCES:
+        if fnmatch.fnmatchcase(name, pattern):
+            return (relative if threshold is None else threshold), absolute
+    return (0.2 if threshold is None else threshold), 0.0
+
+
+def compare(results, baseline, threshold=None):
+    """Metrics worse than the baseline by more than both their relative and absolute tolerance.
+
+    Timings normalized to the reference workload are compared by that ratio; the
+    absolute floor always applies to the raw values.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or name.startswith("machine."):
+            continue
+        # Lower is better for every metric
+        key = "relative" if "relative" in current and "relative" in previous else "value"
+        before, after = abs(previous[key]), abs(current[key])
+        relative, absolute = tolerance(name, threshold)
+        if (before > 0 and after > before * (1 + relative) and
+                abs(current["value"]) - abs(previous["value"]) > absolute):
+            regressions.append((name, previous["value"], current["value"], after / before - 1))
+    return regressions
+
+
+def busy_machine_metrics(results, baseline):
+    """CONTENTION_SENSITIVE patterns whose machine metric is worse than in the baseline,
+    mapped to a description of the difference."""
+    busy = {}
+    for pattern, machine_metric, ratio, absolute in CONTENTION_SENSITIVE:
+        current = results.get(machine_metric)
+        previous = baseline.get("results", {}).get(machine_metric)
+        if (current and previous and current["value"] > previous["value"] * ratio and
+                current["value"] - previous["value"] > absolute):
+            busy[pattern] = (f"{machine_metric} {previous['value']:.3f} -> {current['value']:.3f} "
+                             f"{current['unit']}")
+    return busy
+
+
+def median_results(runs):
+    """Per-metric median over several runs' results."""
+    merged = {}
+    for name, result in runs[0].items():
+        merged[name] = {"unit": result["unit"]}
+        for field in ("value", "relative"):
+            if field in result:
+                merged[name][field] = statistics.median(run[name][field] for run in runs if name in run)
+    return merged
+
+
+def make_report(results, config, confirm):
+    """Results plus the environment and settings they were measured with."""
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "librosa": librosa.__version__ if LIBROSA_AVAILABLE else None,
+            "platform": platform.platform(),
+            "seed": SEED,
+            "config": config,
+            "confirm": confirm,
+        },
+        "results": results,
+    }
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run Project-M benchmarks",
+        epilog="Run on an otherwise idle machine. Timings are compared as ratios to a reference "
+               "workload, but playback scheduling and file I/O still suffer from host contention; "
+               "if the machine is busier than when the baseline was recorded, their regressions "
+               "are reported as inconclusive (exit 3). Memory: the full run analyzes a 1 h tone, "
+               "whose piptrack stage alone needs about 4.5 GB of RAM (roughly 1.2 GB per 10 "
+               "minutes of audio). On smaller machines use --quick or --lengths.",
+    )
+    parser.add_argument("--quick", action="store_true", help="Short run: fewer repeats, tones up to 60 s")
+    parser.add_argument("--only", nargs="+", choices=["synthesis", "sequencing", "io", "extraction"],
+                        help="Run only these groups")
+    parser.add_argument("--lengths", type=int, nargs="+", help="Tone lengths in seconds for extraction")
+    parser.add_argument("--memory", action="store_true",
+                        help="Also record per-stage peak memory in a separate tracemalloc pass")
+    parser.add_argument("--memory-max-length", type=int, default=600,
+                        help="Longest tone (seconds) included in the memory pass (default 600)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write results")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write results as the new baseline")
+    parser.add_argument("--threshold", type=float,
+                        help="Override every metric's allowed relative slowdown (0.2 = 20%%); "
+                             "absolute noise floors still apply")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Re-run a group this many times before reporting its regressions; "
+                             "a baseline is the median of 1 + this many runs (default 2)")
+    args = parser.parse_args()
+
+    groups = set(args.only or ["synthesis", "sequencing", "io", "extraction"])
+    repeat = 5 if args.quick else 10
+    lengths = args.lengths or (QUICK_TONE_LENGTHS if args.quick else TONE_LENGTHS)
+
+    # Run settings that change what a metric means; baselines are only comparable when they match
+    config = {
+        "quick": args.quick,
+        "repeat": repeat,
+        "sequencing_steps": QUICK_SEQUENCING_STEPS if args.quick else SEQUENCING_STEPS,
+        "sequencing_tempo": SEQUENCING_TEMPO,
+        # Whether play_note really plays: without a mixer note costs are near zero
+        "audio": _init_mixer(),
+    }
+    memory_lengths = [seconds for seconds in lengths if seconds <= args.memory_max_length] if args.memory else []
+
+    # Check the baseline up front so a mismatch doesn't cost a full run
+    baseline = None
+    if not args.save_baseline and Path(args.baseline).exists():
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        mismatch = config_mismatch(config, baseline)
+        if mismatch:
+            print(f"Not comparing against {args.baseline}: it was recorded with different settings")
+            for line in mismatch:
+                print(f"  {line}")
+            print("Re-run with matching options or record a new baseline with --save-baseline")
+            return 2
+
+    runners = {}
+    if SEQUENCER_AVAILABLE:
+        runners["synthesis"] = lambda: bench_synthesis(repeat)
+        runners["sequencing"] = lambda: bench_sequencing(config["sequencing_steps"], config["sequencing_tempo"])
+        runners["io"] = lambda: bench_io(repeat)
+    if LIBROSA_AVAILABLE:
+        runners["extraction"] = lambda: bench_extraction(lengths, memory_lengths)
+
+    if LIBROSA_AVAILABLE:
+        _warm_up_extraction()
+
+    results = {}
+    for group, run in runners.items():
+        if group in groups:
+            results.update(run())
+    # Written now so a crash or OOM in the re-runs below can't lose this pass
+    write_report(make_report(results, config, args.confirm), args.output)
+
+    # Baselines take the median of several runs, the same statistic used for
+    # confirmed results below
+    if args.save_baseline:
+        runs = [results]
+        for attempt in range(args.confirm):
+            print(f"Recording baseline (re-run {attempt + 1}/{args.confirm})")
+            rerun = {}
+            for group, run in runners.items():
+                if group in groups:
+                    rerun.update(run())
+            runs.append(rerun)
+        results = median_results(runs)
+
+    # A regression only counts if the median over re-runs of its group still regresses
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    runs = [results]
+    for attempt in range(args.confirm):
+        if not regressions:
+            break
+        suspect_groups = {METRIC_GROUPS[name.split(".")[0]] for name, *_ in regressions}
+        print(f"Possible regressions in {', '.join(sorted(suspect_groups))}; "
+              f"confirming (re-run {attempt + 1}/{args.confirm})")
+        rerun = {}
+        for group in sorted(suspect_groups):
+            rerun.update(runners[group]())
+        runs.append(rerun)
+        results = median_results(runs)
+        regressions = compare(results, baseline, args.threshold)
+
+    report = make_report(results, config, args.confirm)
+    write_report(report, args.output)
+    for name, result in sorted(results.items()):
+        relative = f"  ({result['relative']:.3f}x reference)" if "relative" in result else ""
+        print(f"{name:<45}{result['value']:>14.6f} {result['unit']}{relative}")
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        write_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    busy = busy_machine_metrics(results, baseline)
+    inconclusive = [r for r in regressions
+                    if any(fnmatch.fnmatch(r[0], pattern) for pattern in busy)]
+    regressions = [r for r in regressions if r not in inconclusive]
+
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {before:.6f} -> {after:.6f} (+{change:.0%})")
+    for name, before, after, change in inconclusive:
+        print(f"INCONCLUSIVE {name}: {before:.6f} -> {after:.6f} (+{change:.0%})")
+    if inconclusive:
+        print("The machine was busier than when the baseline was recorded "
+              f"({'; '.join(busy.values())}); re-run on an idle machine to judge the metrics above")
+    if not regressions and not inconclusive:
+        print(f"No regressions beyond tolerance against {args.baseline}")
+    if regressions:
+        return 1
+    return 3 if inconclusive else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
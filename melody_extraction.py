@@ -0,0 +1,37 @@
+"""
+Melody Extraction - Shared Load → Extract pipeline
+Decode → piptrack → frame selection → hz_to_midi, used by Melody.py,
+melody_extractor_gui.py and benchmark.py so all three run the same code.
+"""
+
+import librosa
+from melody_profiling import StageProfiler
+
+
+def extract_melody(audio_path, profiler=None):
+    """Return (pitch_values, midi_notes) for an audio file.
+
+    Each step runs inside `profiler.stage(...)`; the caller enters the profiler
+    (`with profiler:`) so it can time its own stages, such as plotting, alongside.
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+
+    with profiler.stage("decode"):
+        y, sr = librosa.load(audio_path)
+
+    with profiler.stage("piptrack"):
+        pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
+
+    with profiler.stage("frame selection"):
+        pitch_values = []
+        for t in range(pitches.shape[1]):
+            index = magnitudes[:, t].argmax()
+            pitch = pitches[index, t]
+            if pitch > 0:  # filter out non-zero pitches
+                pitch_values.append(pitch)
+
+    with profiler.stage("hz_to_midi"):
+        midi_notes = librosa.hz_to_midi(pitch_values)
+
+    return pitch_values, midi_notes
@@ -1,15 +1,19 @@
+import argparse
 import tkinter as tk
 from tkinter import filedialog
 from tkinterdnd2 import TkinterDnD, DND_FILES
-import librosa
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from melody_extraction import extract_melody
+from melody_profiling import StageProfiler
 
 class MelodyExtractorApp:
-    def __init__(self, root):
+    def __init__(self, root, cprofile_path=None):
         self.root = root
         self.root.title("Melody Extractor")
+        self.cprofile_path = cprofile_path
+        self.stage_hooks = []  # Called with each stage's timing dict
         
         self.load_label = tk.Label(root, text="Drop audio file here or click to browse", bg="lightgray", relief="ridge", padx=10, pady=10)
         self.load_label.pack(pady=10)
@@ -23,6 +27,17 @@ class MelodyExtractorApp:
         self.save_midi_button = tk.Button(root, text="Save MIDI Notes", command=self.save_midi, state=tk.DISABLED)
         self.save_midi_button.pack(pady=10)
         
+        self.report_var = tk.BooleanVar(value=False)
+        self.report_check = tk.Checkbutton(root, text="Show timing report", variable=self.report_var)
+        self.report_check.pack()
+        
+        self.memory_var = tk.BooleanVar(value=False)
+        self.memory_check = tk.Checkbutton(root, text="Track memory (slows timings)", variable=self.memory_var)
+        self.memory_check.pack()
+        
+        self.report_label = tk.Label(root, text="", font=("Courier", 9), justify=tk.LEFT)
+        self.report_label.pack(pady=5)
+        
         self.figure = plt.Figure(figsize=(10, 4), dpi=100)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, root)
@@ -38,24 +53,34 @@ class MelodyExtractorApp:
         self.extract_melody(file_path)
 
     def extract_melody(self, audio_path):
-        y, sr = librosa.load(audio_path)
-        pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
-        
-        self.pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                self.pitch_values.append(pitch)
+        track_memory = self.memory_var.get()
+        show_report = self.report_var.get() or track_memory
+        profiler = StageProfiler(
+            enabled=show_report or bool(self.stage_hooks) or bool(self.cprofile_path),
+            track_memory=track_memory,
+            cprofile=bool(self.cprofile_path),
+        )
+        for hook in self.stage_hooks:
+            profiler.add_hook(hook)
         
-        self.midi_notes = librosa.hz_to_midi(self.pitch_values)
+        with profiler:
+            self.pitch_values, self.midi_notes = extract_melody(audio_path, profiler)
+            
+            with profiler.stage("plot"):
+                self.ax.clear()
+                self.ax.plot(self.pitch_values)
+                self.ax.set_title('Pitch over Time')
+                self.ax.set_xlabel('Time')
+                self.ax.set_ylabel('Pitch (Hz)')
+                self.canvas.draw()
         
-        self.ax.clear()
-        self.ax.plot(self.pitch_values)
-        self.ax.set_title('Pitch over Time')
-        self.ax.set_xlabel('Time')
-        self.ax.set_ylabel('Pitch (Hz)')
-        self.canvas.draw()
+        if show_report:
+            report = profiler.report()
+            print(f"Timing report for {audio_path}:\n{report}")
+            self.report_label.config(text=report)
+        if self.cprofile_path:
+            profiler.dump_cprofile(self.cprofile_path)
+            print(f"cProfile capture saved to {self.cprofile_path}")
         
         self.save_pitch_button.config(state=tk.NORMAL)
         self.save_midi_button.config(state=tk.NORMAL)
@@ -71,6 +96,10 @@ class MelodyExtractorApp:
             np.savetxt(file_path, self.midi_notes, delimiter=',')
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Melody Extractor")
+    parser.add_argument("--cprofile", metavar="PATH", help="Save a cProfile capture of each extraction to PATH")
+    args = parser.parse_args()
+    
     root = TkinterDnD.Tk()
-    app = MelodyExtractorApp(root)
+    app = MelodyExtractorApp(root, cprofile_path=args.cprofile)
     root.mainloop()
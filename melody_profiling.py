@@ -0,0 +1,107 @@
+"""
+Melody Profiling - Per-stage timing for the melody extraction pipeline
+Times each stage (decode, piptrack, frame selection, hz_to_midi, plotting), optionally
+records peak traced memory, notifies hooks as stages finish and can capture a cProfile run.
+"""
+
+import cProfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfiler:
+    """Collects wall time and peak memory for each named pipeline stage.
+
+    Use it around a whole run and wrap each stage:
+
+        profiler = StageProfiler(on_stage=print)
+        with profiler:
+            with profiler.stage("decode"):
+                y, sr = librosa.load(audio_path)
+        print(profiler.report())
+
+    A disabled profiler keeps the same API but records nothing, so callers don't
+    need separate code paths.
+
+    Memory tracking (tracemalloc) is opt-in because it slows Python-heavy stages
+    several times over; reports flag timings taken with it on. It is never combined
+    with a cProfile capture.
+    """
+
+    def __init__(self, enabled=True, track_memory=False, cprofile=False, on_stage=None):
+        self.enabled = enabled
+        self.track_memory = track_memory and not cprofile
+        self.stages = []  # One dict per finished stage: name, seconds, peak_mb
+        self.hooks = [on_stage] if on_stage else []
+        self._profile = cProfile.Profile() if (enabled and cprofile) else None
+        self._started_tracemalloc = False
+
+    def add_hook(self, hook):
+        """Register a callable that receives each stage's dict when it finishes."""
+        self.hooks.append(hook)
+
+    def __enter__(self):
+        if self.enabled and self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self._profile:
+            self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile:
+            self._profile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one stage."""
+        if not self.enabled:
+            yield
+            return
+
+        measure_memory = self.track_memory and tracemalloc.is_tracing()
+        if measure_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"name": name, "seconds": time.perf_counter() - start, "peak_mb": None}
+            if measure_memory:
+                record["peak_mb"] = max(tracemalloc.get_traced_memory()[1] - base, 0) / 2**20
+            self.stages.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+    @property
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.stages)
+
+    @property
+    def memory_tracked(self):
+        """True if any stage was timed with tracemalloc running."""
+        return any(record["peak_mb"] is not None for record in self.stages)
+
+    def report(self):
+        """Human-readable timing table."""
+        total = self.total_seconds
+        lines = [f"{'Stage':<18}{'Time (s)':>10}{'Share':>8}{'Peak (MB)':>11}"]
+        for record in self.stages:
+            share = record["seconds"] / total * 100 if total else 0
+            peak = f"{record['peak_mb']:.1f}" if record["peak_mb"] is not None else "-"
+            lines.append(f"{record['name']:<18}{record['seconds']:>10.3f}{share:>7.1f}%{peak:>11}")
+        lines.append(f"{'Total':<18}{total:>10.3f}")
+        if self.memory_tracked:
+            lines.append("Note: timings inflated by tracemalloc; rerun without memory tracking to compare stages")
+        return "\n".join(lines)
+
+    def dump_cprofile(self, path):
+        """Write the cProfile capture for snakeviz/pstats."""
+        if self._profile:
+            self._profile.dump_stats(path)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Pattern Index - Similarity search over saved sequencer patterns
+Bit-packs each 8 notes × 16 steps grid into 128 bits and answers k-nearest-neighbour
+queries by Hamming distance (vectorized XOR + popcount).
+Features: Transposition/rotation-invariant search, query by quantized melody, .npz cache.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import numpy as np
+
+
+# Same layout as MusicSequencer: C5..C4, high to low
+NOTES = ["C5", "B4", "A4", "G4", "F4", "E4", "D4", "C4"]
+NOTE_MIDI = np.array([72, 71, 69, 67, 65, 64, 62, 60])
+NUM_STEPS = 16
+
+# Bits set in every byte value, used when np.bitwise_count is unavailable (numpy < 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(codes):
+    """Count set bits per row of a (N, words) uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes).sum(axis=-1, dtype=np.int32)
+    as_bytes = np.ascontiguousarray(codes).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int32)
+
+
+def pack_grid(grid):
+    """Pack a boolean grid (notes × steps) into an array of uint64 words."""
+    bits = np.asarray(grid, dtype=bool).reshape(-1)
+    packed = np.packbits(bits)
+    # Pad to a whole number of 64-bit words
+    padded = np.zeros(-(-packed.size // 8) * 8, dtype=np.uint8)
+    padded[:packed.size] = packed
+    return padded.view(np.uint64)
+
+
+def grid_from_midi(midi_notes, num_steps=NUM_STEPS):
+    """Build a sequencer grid from per-frame quantized MIDI notes (e.g. extractor output).
+
+    The melody is split into `num_steps` equal chunks; each chunk's median note is
+    folded into the C4-C5 octave and placed on the nearest row.
+    """
+    grid = np.zeros((len(NOTES), num_steps), dtype=bool)
+    midi_notes = np.asarray(midi_notes, dtype=float)
+    midi_notes = midi_notes[np.isfinite(midi_notes)]
+    if midi_notes.size == 0:
+        return grid
+
+    for step, chunk in enumerate(np.array_split(midi_notes, num_steps)):
+        if chunk.size == 0:
+            continue
+        note = np.round(np.median(chunk))
+        # Fold into the sequencer's octave (C4 = 60 .. C5 = 72)
+        while note < NOTE_MIDI.min():
+            note += 12
+        while note > NOTE_MIDI.max():
+            note -= 12
+        grid[np.abs(NOTE_MIDI - note).argmin(), step] = True
+    return grid
+
+
+def read_pattern_file(path):
+    """Read the grid from a slot file ("notes") or an exported pattern ("grid")."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    grid = data.get("notes", data.get("grid"))
+    if (isinstance(grid, list) and len(grid) == len(NOTES) and
+            all(isinstance(row, list) and len(row) == NUM_STEPS for row in grid)):
+        return grid
+    return None
+
+
+class PatternIndex:
+    """Bit-packed pattern library with Hamming-distance nearest-neighbour search."""
+
+    def __init__(self, num_notes=len(NOTES), num_steps=NUM_STEPS):
+        self.num_notes = num_notes
+        self.num_steps = num_steps
+        self.num_words = -(-num_notes * num_steps // 64)
+        self.names = []
+        self._codes = np.zeros((0, self.num_words), dtype=np.uint64)
+        self._pending = []  # Codes added since the last query, stacked lazily
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def codes(self):
+        """All packed grids as a (N, words) uint64 array."""
+        if self._pending:
+            self._codes = np.vstack([self._codes, np.array(self._pending, dtype=np.uint64)])
+            self._pending = []
+        return self._codes
+
+    def add(self, name, grid):
+        """Add a single grid under the given name."""
+        grid = np.asarray(grid, dtype=bool)
+        if grid.shape != (self.num_notes, self.num_steps):
+            raise ValueError(f"Expected a {self.num_notes}x{self.num_steps} grid, got {grid.shape}")
+        self.names.append(name)
+        self._pending.append(pack_grid(grid))
+
+    def add_file(self, path):
+        """Add a pattern JSON file; returns False if the file is not a valid pattern."""
+        try:
+            grid = read_pattern_file(path)
+        except (OSError, ValueError, AttributeError):
+            return False
+        if grid is None:
+            return False
+        self.add(str(path), grid)
+        return True
+
+    @classmethod
+    def from_directory(cls, directory, pattern="*.json"):
+        """Build an index from every pattern JSON file under a directory."""
+        index = cls()
+        for path in sorted(Path(directory).rglob(pattern)):
+            index.add_file(path)
+        return index
+
+    def save(self, path):
+        """Save the packed index so the JSON files don't need to be re-read."""
+        np.savez(path, codes=self.codes, names=np.array(self.names, dtype=str),
+                 shape=np.array([self.num_notes, self.num_steps]))
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()."""
+        with np.load(path) as data:
+            num_notes, num_steps = (int(v) for v in data["shape"])
+            index = cls(num_notes, num_steps)
+            index._codes = data["codes"].astype(np.uint64)
+            index.names = [str(name) for name in data["names"]]
+        return index
+
+    def _query_variants(self, grid, transpose, rotate):
+        """Packed codes for every transposition/rotation of the query grid."""
+        grid = np.asarray(grid, dtype=bool)
+        if grid.shape != (self.num_notes, self.num_steps):
+            raise ValueError(f"Expected a {self.num_notes}x{self.num_steps} grid, got {grid.shape}")
+
+        shifts = [0]
+        used_rows = np.flatnonzero(grid.any(axis=1))
+        if transpose and used_rows.size:
+            # Only shifts that keep every note on the grid, so no notes are dropped
+            shifts = range(-int(used_rows[0]), self.num_notes - int(used_rows[-1]))
+        rotations = range(self.num_steps) if rotate else [0]
+
+        variants = []
+        for shift in shifts:
+            shifted = np.roll(grid, shift, axis=0)
+            for rotation in rotations:
+                variants.append(pack_grid(np.roll(shifted, rotation, axis=1)))
+        return np.unique(np.array(variants, dtype=np.uint64), axis=0)
+
+    def distances(self, grid, transpose=False, rotate=False):
+        """Hamming distance from the query grid to every indexed pattern.
+
+        With transpose/rotate the minimum over all pitch shifts/step rotations is used.
+        """
+        codes = self.codes
+        best = None
+        for variant in self._query_variants(grid, transpose, rotate):
+            dist = _popcount(codes ^ variant)
+            best = dist if best is None else np.minimum(best, dist, out=best)
+        return best
+
+    def query(self, grid, k=5, transpose=False, rotate=False):
+        """Return the k nearest patterns as a list of (name, distance), closest first."""
+        if len(self) == 0:
+            return []
+        dist = self.distances(grid, transpose=transpose, rotate=rotate)
+        k = min(k, dist.size)
+        nearest = np.argpartition(dist, k - 1)[:k]
+        nearest = nearest[np.argsort(dist[nearest], kind="stable")]
+        return [(self.names[i], int(dist[i])) for i in nearest]
+
+    def query_melody(self, midi_notes, k=5, transpose=True, rotate=False):
+        """Find patterns similar to a quantized melody (see grid_from_midi)."""
+        grid = grid_from_midi(midi_notes, self.num_steps)
+        return self.query(grid, k=k, transpose=transpose, rotate=rotate)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Find saved sequencer patterns similar to a query")
+    parser.add_argument("library", help="Directory of pattern JSON files, or a saved .npz index")
+    parser.add_argument("query", nargs="?",
+                        help="Pattern JSON file, or a text file of MIDI notes (as saved by the extractor)")
+    parser.add_argument("-k", type=int, default=5, help="Number of matches to show")
+    parser.add_argument("--transpose", action="store_true", help="Ignore pitch transposition")
+    parser.add_argument("--rotate", action="store_true", help="Ignore step rotation")
+    parser.add_argument("--save", metavar="NPZ", help="Write the index to an .npz file")
+    args = parser.parse_args()
+
+    if args.library.endswith(".npz"):
+        index = PatternIndex.load(args.library)
+    else:
+        index = PatternIndex.from_directory(args.library)
+    print(f"Indexed {len(index)} patterns")
+
+    if args.save:
+        index.save(args.save)
+        print(f"Index saved to {args.save}")
+
+    if args.query:
+        if args.query.endswith(".json"):
+            grid = read_pattern_file(args.query)
+            if grid is None:
+                parser.error(f"Invalid pattern file: {args.query}")
+        else:
+            grid = grid_from_midi(np.loadtxt(args.query, delimiter=',', ndmin=1))
+        for name, dist in index.query(grid, k=args.k, transpose=args.transpose, rotate=args.rotate):
+            print(f"{dist:4d}  {name}")
+
+
+if __name__ == "__main__":
+    main()